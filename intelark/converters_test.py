@@ -1,4 +1,4 @@
-from converters import sizeToBytes, speedToHz
+from converters import sizeToBytes, speedToHz, toList
 
 if __name__ == '__main__':
     wanted = 3460000000
@@ -15,3 +15,9 @@ if __name__ == '__main__':
     got = sizeToBytes("768 GB")
     if got != wanted:
         raise ValueError(f"wanted {wanted} got {got}")
+
+    # cleantxt has collapsed whitespace, so ", " is the only separator
+    wanted = ["SSE4.1", "SSE4.2", "AVX 2.0"]
+    got = toList("SSE4.1, SSE4.2, AVX 2.0")
+    if got != wanted:
+        raise ValueError(f"wanted {wanted} got {got}")
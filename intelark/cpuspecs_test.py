@@ -0,0 +1,84 @@
+from scrapy.http import HtmlResponse
+
+from intelark.items import CPUSpecsItem
+from intelark.spiders.cpuspecs import CpuSpecSpider
+
+URL = "https://ark.intel.com/content/www/us/en/ark/products/82764/intel-xeon-processor-e5-1630-v3-10m-cache-3-70-ghz.html"
+
+
+def row(label: str, *spans: str) -> str:
+    return (f'<div class="row tech-section-row">'
+            f'<div class="col-xs-6 tech-label"><span>{label}</span></div>'
+            f'<div class="col-xs-6 tech-data">{"".join(spans)}</div>'
+            f'</div>')
+
+
+def page(*rows: str, name: str = "<span>Intel® Xeon® E5-1630</span>", sockets: str = "FCLGA2011-3") -> bytes:
+    return f"""<html><body>
+<div class="breadcrumb"><div class="current-page">{name}</div></div>
+<div data-target="processors-specifications">
+<div><div class="row heading-row"><div><h3>Essentials</h3></div></div>{row("Processor Number", "<span>E5-1630V3</span>")}</div>
+<div><div class="row heading-row"><div><h3>Performance</h3></div></div>{"".join(rows)}</div>
+<div><div class="row heading-row"><div><h3>Package Specifications</h3></div></div>{row("Sockets Supported", f"<span>{sockets}</span>")}</div>
+<div><a>Download Specifications</a></div>
+</div>
+</body></html>""".encode("utf8")
+
+
+def parse(body: bytes) -> list:
+    spider = CpuSpecSpider(url=URL)
+    return list(spider.parse_specs(HtmlResponse(url=URL, body=body, encoding="utf8")))
+
+
+if __name__ == '__main__':
+    # Second value span of a row must not shift values of the following rows
+    specs = parse(page(
+        row("Processor Base Frequency", "<span>3.70 GHz</span>", "<span>x</span>"),
+        row("ECC Memory Supported", "<span>Yes</span>"),
+    ))[-1]
+
+    wanted = {"Processor Base Frequency": "3.70 GHz", "ECC Memory Supported": True}
+    got = specs["Performance"]
+    if got != wanted:
+        raise ValueError(f"wanted {wanted} got {got}")
+
+    # Skipped row whose value span holds only a link lowers the value count,
+    # rows are then paired one by one and keep their own values
+    specs = parse(page(
+        row("Datasheet", "<span><a>View now</a></span>"),
+        row("Processor Base Frequency", "<span>3.70 GHz</span>", "<span>x</span>"),
+        row("# of Cores", "<span>4</span>"),
+    ))[-1]
+
+    wanted = {"Processor Base Frequency": "3.70 GHz", "# of Cores": "4"}
+    got = specs["Performance"]
+    if got != wanted:
+        raise ValueError(f"wanted {wanted} got {got}")
+
+    # Name span starting with an element, name is the first text node
+    specs = parse(page(row("# of Cores", "<span>4</span>"), name="<span><b>Intel®</b> Xeon® E5-1630</span>"))[-1]
+
+    wanted = "Xeon E5-1630"
+    got = specs["name"]
+    if got != wanted:
+        raise ValueError(f"wanted {wanted} got {got}")
+
+    # Page without a name fails in the spider, not later in the pipeline
+    try:
+        specs = parse(page(row("# of Cores", "<span>4</span>"), name=""))[-1]
+    except ValueError:
+        pass
+    else:
+        raise ValueError(f"wanted error got {specs['name']}")
+
+    # Several sockets give one item listing all of them
+    items = parse(page(row("# of Cores", "<span>4</span>"), sockets="FCLGA2011-3, FCLGA2011"))
+    specs = [item for item in items if isinstance(item, CPUSpecsItem)]
+
+    if len(specs) != 1:
+        raise ValueError(f"wanted 1 item got {len(specs)}")
+
+    wanted = ["FCLGA2011-3", "FCLGA2011"]
+    got = specs[0].get("sockets")
+    if got != wanted:
+        raise ValueError(f"wanted {wanted} got {got}")
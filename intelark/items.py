@@ -4,6 +4,8 @@
 class BaseItem(dict):
     pass
 
+
+# CPU specifications with "sockets" listing all supported sockets
 class CPUSpecsItem(BaseItem):
     pass
 
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
+import math
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 from scrapy import signals
+from scrapy.downloadermiddlewares.retry import RetryMiddleware, get_retry_request
 
 
 class IntelarkSpiderMiddleware(object):
@@ -48,3 +52,69 @@ class IntelarkDownloaderMiddleware(object):
 
     def spider_opened(self, spider):
         spider.logger.info('Spider opened: %s' % spider.name)
+
+
+class TooManyRequestsRetryMiddleware(RetryMiddleware):
+    """
+    Retry HTTP 429 responses and slow down the download slot for the time
+    given in Retry-After header. Other responses are handled by RetryMiddleware.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mw = super().from_crawler(crawler)
+        # Never wait longer than AutoThrottle would
+        mw.max_delay = crawler.settings.getfloat('AUTOTHROTTLE_MAX_DELAY', 60.0)
+        return mw
+
+    def retry_after(self, response):
+        """
+        Seconds to wait from Retry-After header, which is either seconds or HTTP-date.
+        None when the header is missing or unusable, dates in the past give 0.
+        """
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+
+        value = value.decode('latin-1').strip()
+
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+
+            delay = (when - datetime.now(timezone.utc)).total_seconds()
+
+        # nan and inf are accepted by float()
+        if not math.isfinite(delay):
+            return None
+
+        return max(delay, 0.0)
+
+    def process_response(self, request, response, spider=None):
+        if response.status != 429 or request.meta.get('dont_retry', False):
+            return super().process_response(request, response)
+
+        spider = self.crawler.spider
+
+        slot = self.crawler.engine.downloader.slots.get(request.meta.get('download_slot'))
+        if slot is not None:
+            delay = self.retry_after(response)
+            if delay is None:
+                # No usable header, back off exponentially
+                delay = max(slot.delay * 2, 1.0)
+            slot.delay = max(slot.delay, min(delay, self.max_delay))
+            spider.logger.info(f"429 from {request.url}, delaying slot by {slot.delay:.1f}s")
+
+        retry = get_retry_request(
+            request,
+            spider=spider,
+            reason='429 Too Many Requests',
+        )
+        return retry or response
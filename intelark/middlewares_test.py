@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import scrapy
+from scrapy.http import Response
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from intelark.middlewares import TooManyRequestsRetryMiddleware
+
+
+URL = "https://www.intel.com/"
+
+
+class Stub(object):
+    pass
+
+
+def middleware(*delays: float):
+    """
+    Middleware with a stub downloader which has one slot per given delay
+    """
+    crawler = get_crawler(scrapy.Spider, {"AUTOTHROTTLE_MAX_DELAY": 60})
+    crawler.spider = scrapy.Spider.from_crawler(crawler, name="test")
+    crawler.engine = Stub()
+    crawler.engine.downloader = Stub()
+    crawler.engine.downloader.slots = {}
+
+    for i, delay in enumerate(delays):
+        slot = Stub()
+        slot.delay = delay
+        crawler.engine.downloader.slots[f"slot{i}"] = slot
+
+    return TooManyRequestsRetryMiddleware.from_crawler(crawler), crawler.engine.downloader.slots
+
+
+def too_many(mw, slot: str, retry_after=None, **meta):
+    request = scrapy.Request(URL, meta=dict(meta, download_slot=slot))
+    headers = {} if retry_after is None else {"Retry-After": retry_after}
+    response = Response(URL, status=429, headers=headers, request=request)
+    return response, mw.process_response(request, response)
+
+
+def retry_after(value):
+    mw = TooManyRequestsRetryMiddleware(Settings())
+    headers = {} if value is None else {"Retry-After": value}
+    return mw.retry_after(Response("https://www.intel.com/", status=429, headers=headers))
+
+
+if __name__ == '__main__':
+    for value, wanted in [
+        ("120", 120.0),
+        (" 1.5 ", 1.5),
+        # Already passed
+        ("-5", 0.0),
+        (format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True), 0.0),
+        # Unusable
+        (None, None),
+        ("", None),
+        ("soon", None),
+        ("nan", None),
+        ("inf", None),
+    ]:
+        got = retry_after(value)
+        if got != wanted:
+            raise ValueError(f"{value!r}: wanted {wanted} got {got}")
+
+    # HTTP-date in the future
+    when = datetime.now(timezone.utc) + timedelta(seconds=60)
+    got = retry_after(format_datetime(when, usegmt=True))
+    if not 55 <= got <= 60:
+        raise ValueError(f"wanted about 60 got {got}")
+
+    mw, slots = middleware(0.0, 5.0, 2.0, 0.0, 0.0, 0.0)
+
+    # Slot delay raised to Retry-After and request retried
+    response, got = too_many(mw, "slot0", "30")
+    if not isinstance(got, scrapy.Request) or got.meta["retry_times"] != 1:
+        raise ValueError(f"wanted retry request got {got}")
+    if slots["slot0"].delay != 30:
+        raise ValueError(f"wanted 30 got {slots['slot0'].delay}")
+
+    # Capped at AUTOTHROTTLE_MAX_DELAY
+    too_many(mw, "slot1", "3600")
+    if slots["slot1"].delay != 60:
+        raise ValueError(f"wanted 60 got {slots['slot1'].delay}")
+
+    # Missing header doubles the delay, at least one second
+    too_many(mw, "slot2")
+    if slots["slot2"].delay != 4:
+        raise ValueError(f"wanted 4 got {slots['slot2'].delay}")
+    too_many(mw, "slot3")
+    if slots["slot3"].delay != 1:
+        raise ValueError(f"wanted 1 got {slots['slot3'].delay}")
+
+    # Retries used up, response is returned
+    response, got = too_many(mw, "slot4", "30", max_retry_times=0)
+    if got is not response:
+        raise ValueError(f"wanted response got {got}")
+
+    # dont_retry passes the response through without touching the slot
+    response, got = too_many(mw, "slot5", "30", dont_retry=True)
+    if got is not response or slots["slot5"].delay != 0:
+        raise ValueError(f"wanted untouched response got {got}, delay {slots['slot5'].delay}")
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import os
 import json
 from tempfile import NamedTemporaryFile
@@ -7,7 +8,7 @@ from shutil import move
 
 import scrapy
 
-from intelark.items import *
+from intelark.items import BaseItem, CPULegendItem, CPUSpecsItem, CPUSpecsUnknownItem
 
 
 class IntelarkPipeline(object):
@@ -20,7 +21,7 @@ class IntelarkPipeline(object):
     def create_path(self, fpath):
         Path(fpath).mkdir(parents=True, exist_ok=True)
 
-    def process_item(self, item: BaseItem, spider: scrapy.Spider):
+    async def process_item(self, item: BaseItem, spider: scrapy.Spider):
         if isinstance(item, CPULegendItem):
             # Update legend information
             for i in item:
@@ -34,15 +35,11 @@ class IntelarkPipeline(object):
             spider.logger.error("Skipped item {0}".format(type(item)))
             return
 
-        # Save to temporary file
-        tmpf = NamedTemporaryFile("w", prefix="cpu-specs-", suffix=".json", encoding="utf8", delete=False)
-        with tmpf as f:
-            json.dump(item, f)
-            f.flush()
-            spider.logger.info(f"saved as {f.name}")
+        # File I/O is done in a thread so parsing of other responses can continue
+        await asyncio.to_thread(self.save_item, item, spider)
 
+    def save_item(self, item: BaseItem, spider: scrapy.Spider):
         basepath = os.path.abspath(os.path.join("..", "items", "cpuspecs"))
-        fullpath = os.path.abspath(os.path.join(basepath, "tmp"))
 
         if "id" in item:
             fname = item["id"] + ".json"
@@ -50,16 +47,28 @@ class IntelarkPipeline(object):
             fname = item["name"] + ".json"
 
         if isinstance(item, CPUSpecsItem):
-            # path for saving
-            fpath = os.path.abspath(os.path.join(basepath, item["socket"]))
-            self.create_path(fpath)
-            fullpath = os.path.join(fpath, fname)
+            # One file per supported socket, each listing only its own socket
+            specs = {k: v for k, v in item.items() if k != "sockets"}
+
+            for socket in item["sockets"]:
+                # path for saving
+                fpath = os.path.abspath(os.path.join(basepath, socket))
+                self.create_path(fpath)
+                self.save_json(dict(specs, socket=socket), os.path.join(fpath, fname), spider)
 
         elif isinstance(item, CPUSpecsUnknownItem):
             # path for saving
             fpath = os.path.abspath(os.path.join(basepath, "_unknown", item["Essentials"]["Vertical Segment"]))
             self.create_path(fpath)
-            fullpath = os.path.join(fpath, fname)
+            self.save_json(item, os.path.join(fpath, fname), spider)
+
+    def save_json(self, data: dict, fullpath: str, spider: scrapy.Spider):
+        # Save to temporary file
+        tmpf = NamedTemporaryFile("w", prefix="cpu-specs-", suffix=".json", encoding="utf8", delete=False)
+        with tmpf as f:
+            json.dump(data, f)
+            f.flush()
+            spider.logger.info(f"saved as {f.name}")
 
         # Rename and move the temporary file to actual file
         newpath = move(tmpf.name, fullpath)
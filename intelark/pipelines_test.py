@@ -0,0 +1,43 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+
+import scrapy
+
+from intelark.items import CPUSpecsItem
+from intelark.pipelines import IntelarkPipeline
+
+if __name__ == '__main__':
+    item = CPUSpecsItem({
+        "name": "Xeon E5-1630 v3",
+        "arkid": 82764,
+        "Essentials": {"Vertical Segment": "Server"},
+        "id": "E5-1630V3",
+        "sockets": ["FCLGA2011-3", "FCLGA2011"],
+    })
+
+    cwd = os.getcwd()
+    with TemporaryDirectory() as tmp:
+        # Pipeline saves to ../items/cpuspecs relative to working directory
+        os.mkdir(os.path.join(tmp, "run"))
+        os.chdir(os.path.join(tmp, "run"))
+        try:
+            IntelarkPipeline().save_item(item, scrapy.Spider(name="test"))
+        finally:
+            os.chdir(cwd)
+
+        basepath = os.path.join(tmp, "items", "cpuspecs")
+
+        # One file per socket
+        wanted = ["FCLGA2011", "FCLGA2011-3"]
+        got = sorted(os.listdir(basepath))
+        if got != wanted:
+            raise ValueError(f"wanted {wanted} got {got}")
+
+        for socket in wanted:
+            with open(os.path.join(basepath, socket, "E5-1630V3.json"), encoding="utf8") as f:
+                specs = json.load(f)
+
+            # Only its own socket, no list of all sockets
+            if specs.get("socket") != socket or "sockets" in specs:
+                raise ValueError(f"wanted socket {socket} got {specs}")
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
-from urllib.parse import urlsplit
+import re
 
 import scrapy
+from lxml import etree
 from scrapy.exceptions import CloseSpider
 
-from intelark.converters import *
-from intelark.items import *
+from intelark.converters import sizeToBytes, speedToHz, toList, toPackage, toTDP
+from intelark.items import CPULegendItem, CPUSpecsItem, CPUSpecsUnknownItem
 
 convertTo = {
     "NumPCIExpressPorts": int,
@@ -37,19 +38,33 @@ convertTo = {
     "BusNumPorts": int,
 }
 
-skipIfValue = [
+skipIfValue = frozenset({
     "View now",
     "Additional Information URL",
     "Datasheet",
-]
+})
 
-skipIfKey = [
+skipIfKey = frozenset({
     "Product Brief",
     "Additional Information URL",
     "Datasheet",
     "Product Collection",
     "Code Name",
-]
+})
+
+# Values with a fixed machine readable presentation
+literalValues = {
+    "Yes": True,
+    "No": False,
+    "": None,
+}
+
+
+def first(nodes: list):
+    """
+    First result of a compiled XPath, or None (same as SelectorList.get())
+    """
+    return nodes[0] if nodes else None
 
 
 class BaseSpider(scrapy.Spider):
@@ -63,23 +78,48 @@ class BaseSpider(scrapy.Spider):
     ]
 
     start_urls = [
-        'https://ark.intel.com/content/www/us/en/ark.html',
         'https://www.intel.com/content/www/us/en/ark.html',
     ]
 
+    # Characters removed by cleantxt: tm, (c), double dagger
+    _DROP = str.maketrans('', '', "\u2122\u00ae\u2021")
+    _WS = re.compile(r'\s+')
+
+    # Intel Ark internal CPU id, such as 82764 in .../ark/products/82764/intel-xeon-...html
+    _ARKID_RE = re.compile(r'/products/(?:sku/)?(\d+)')
+
+    # Size of the pieces of response body fed to the streaming parser
+    _STREAM_CHUNK = 64 * 1024
+
+    # Precompiled XPath expressions, evaluated against response.selector.root
+    # or against elements from the streaming parser
+    # Class names are matched as whole tokens, ARK mixes them with layout classes
+    _XP_HEADER = etree.XPath("./div[contains(concat(' ', normalize-space(@class), ' '), ' heading-row ')]/div/h3/text()")
+    _XP_ROWS = etree.XPath("./div[contains(concat(' ', normalize-space(@class), ' '), ' tech-section-row ')]")
+    _XP_LABEL = etree.XPath("./div[contains(concat(' ', normalize-space(@class), ' '), ' tech-label ')]/span/text()")
+    _XP_DATA = etree.XPath("./div[contains(concat(' ', normalize-space(@class), ' '), ' tech-data ')]/span/text()")
+    # Labels and values of all rows in a section, at most one text node per row
+    # so a row can only lower the count, never make up for another row
+    _XP_ROWCOUNT = etree.XPath("count(./div[contains(concat(' ', normalize-space(@class), ' '), ' tech-section-row ')])")
+    _XP_LABELS = etree.XPath("./div[contains(concat(' ', normalize-space(@class), ' '), ' tech-section-row ')]"
+                             "/div[contains(concat(' ', normalize-space(@class), ' '), ' tech-label ')][1]/span[1]/text()[1]")
+    _XP_VALUES = etree.XPath("./div[contains(concat(' ', normalize-space(@class), ' '), ' tech-section-row ')]"
+                             "/div[contains(concat(' ', normalize-space(@class), ' '), ' tech-data ')][1]/span[1]/text()[1]")
+    # First breadcrumb text only, evaluation stops at the first match
+    _XP_CRUMB = etree.XPath("(//a[contains(concat(' ', normalize-space(@class), ' '), ' hidden-crumb-xs ')]/text())[1]")
+    # Only links pointing to product pages
+    _XP_PRODLINKS = etree.XPath("//tr/td/div/a[contains(@href, '/products/')]/@href")
+    # First text node, also when the span starts with a child element
+    _XP_CURNAME = etree.XPath("./span/text()")
+
     def parse(self, response: scrapy.http.Response):
         # Use spiders derived from this class
         raise NotImplementedError
 
     def cleantxt(self, v: str) -> str:
         v = v.replace("Intel", "")
-        v = v.replace("\u2122", "")  # tm
-        v = v.replace("\u00ae", "")  # (c)
-        v = v.replace("\u2021", "")  #
-
-        v = ' '.join(v.split())
-        v = v.strip()
-        return v
+        v = v.translate(self._DROP)
+        return self._WS.sub(' ', v).strip()
 
     def parse_series(self, response: scrapy.http.Response):
         """
@@ -89,28 +129,76 @@ class BaseSpider(scrapy.Spider):
         """
 
         # Find Products Home > Product Specifications > Processors breadcrumb
-        if response.xpath("//a[contains(@class, 'hidden-crumb-xs')]/text()").get().strip() != "Processors":
+        crumb = self._XP_CRUMB(response.selector.root)
+        if not crumb or crumb[0].strip() != "Processors":
             raise scrapy.exceptions.CloseSpider("Processors not found in crumb")
 
-        for link in response.xpath("//tr/td/div/a/@href"):
-            if link.root.find("/products/") == -1:
-                self.logger.error("product not found from link, skipping")
+        # Same product can be linked more than once, skip it before the scheduler
+        seen = set()
+
+        for link in self._XP_PRODLINKS(response.selector.root):
+            url = response.urljoin(link)
+            if url in seen:
                 continue
-            yield scrapy.Request(response.urljoin(link.root), callback=self.parse_specs)
+            seen.add(url)
+            yield scrapy.Request(url, callback=self.parse_specs)
+
+    def stream_specs(self, response: scrapy.http.TextResponse):
+        """
+        Stream-parse a specification page instead of building the whole document.
+        Yields ("name", text) for the current page breadcrumb and ("section", div)
+        for each specification section as soon as it is complete.
+        Parsing stops once both the name and all sections have been seen.
+        """
+        parser = etree.HTMLPullParser(events=("end",), tag="div", encoding=response.encoding)
+        body = response.body
+
+        def events():
+            for pos in range(0, len(body), self._STREAM_CHUNK):
+                parser.feed(body[pos:pos + self._STREAM_CHUNK])
+                yield from parser.read_events()
+            parser.close()
+            yield from parser.read_events()
+
+        has_name = False
+        has_specs = False
+
+        for _, elem in events():
+            if elem.get("data-target") == "processors-specifications":
+                # All sections have been seen
+                has_specs = True
+            elif not has_name and "current-page" in elem.get("class", "").split():
+                name = first(self._XP_CURNAME(elem))
+                if name is not None:
+                    has_name = True
+                    yield "name", name
+            else:
+                parent = elem.getparent()
+                if parent is not None and parent.get("data-target") == "processors-specifications":
+                    # Section holding only the "Download Specifications" link,
+                    # plain child lookup uses ElementPath, cheaper than XPath
+                    if (elem.findtext("a") or "").strip() != "Download Specifications":
+                        yield "section", elem
+                    # Section has been handled, free its subtree
+                    elem.clear()
+
+            if has_name and has_specs:
+                return
 
     def parse_specs(self, response: scrapy.http.Response):
         """
         Get specifications of one CPU
         """
         # Get Intel Ark internal CPU id from URL
-        arkcpuid = int(urlsplit(response.url).path.strip('/').split('/')[6])
-
-        cpuname = response.xpath("//div[contains(@class, 'current-page')]/span/text()").get()
-        cpuname = self.cleantxt(cpuname)
+        m = self._ARKID_RE.search(response.url)
+        if m is None:
+            raise ValueError(f"ark id not found from url {response.url}")
+        arkcpuid = int(m.group(1))
 
         specs = {
             "URL": response.url,
-            "name": cpuname,
+            # Filled in from the breadcrumb while streaming
+            "name": None,
             "arkid": arkcpuid,
         }
 
@@ -119,52 +207,62 @@ class BaseSpider(scrapy.Spider):
         # "GraphicsMaxFreq": "Graphics Max Dynamic Frequency"
         legends = {}
 
-        for section in response.xpath("//div[@data-target='processors-specifications']/div"):
-            if section.xpath("a/text()").get() == 'Download Specifications':
+        for kind, section in self.stream_specs(response):
+            if kind == "name":
+                specs["name"] = self.cleantxt(section)
                 continue
-            header = section.xpath("div[contains(@class, 'heading-row')]/div/h3/text()").get()
+
+            header = first(self._XP_HEADER(section))
             if header not in specs:
                 # Add header
                 specs[header] = {}
                 legends[header] = {}
+            sec = specs[header]
+            leg = legends[header]
             # section.xpath("div[@class='tech-section']")
-            for data in section.xpath("div[contains(@class, 'tech-section-row')]"):
+            labels = self._XP_LABELS(section)
+            values = self._XP_VALUES(section)
+            if not len(labels) == len(values) == self._XP_ROWCOUNT(section):
+                # Some row lacks a label or value, pair them row by row instead
+                rows = self._XP_ROWS(section)
+                labels = [first(self._XP_LABEL(data)) for data in rows]
+                values = [first(self._XP_DATA(data)) for data in rows]
+
+            for k, v in zip(labels, values):
                 # Find specifications under each header
 
-                # Get key, such as "ECC Memory Supported"
-                k = data.xpath("div[contains(@class, 'tech-label')]/span/text()").get().strip()
-
+                # Key, such as "ECC Memory Supported"
+                k = k.strip()
 
                 if k in skipIfKey:
                     continue
 
-                legends[header][k] = self.cleantxt(k)
-
-                # Get value, such as "5 GHz"
-                v = "".join(data.xpath("div[contains(@class, 'tech-data')]/span/text()").get()).strip()
+                leg[k] = self.cleantxt(k)
 
+                # Value, such as "5 GHz"
                 v = self.cleantxt(v)
 
                 if v in skipIfValue:
                     continue
 
-                if v == 'Yes':
-                    v = True
-                elif v == 'No':
-                    v = False
-                elif v == '':
-                    v = None
-                elif k in convertTo:
+                # Returns v itself when it is not a yes/no/empty value
+                literal = literalValues.get(v, v)
+                if literal is not v:
+                    v = literal
+                elif (conv := convertTo.get(k)) is not None:
                     # Try to convert value to machine parsable presentation
                     try:
-                        v = convertTo[k](v)
+                        v = conv(v)
                     except ValueError as e:
                         reason = f"FAILED: {k}: {v}"
                         # Stop the entire spider (for debugging purposes)
                         # raise scrapy.exceptions.CloseSpider(reason)
                         raise ValueError(reason)
 
-                specs[header][k] = v
+                sec[k] = v
+
+        if specs["name"] is None:
+            raise ValueError(f"name not found from {response.url}")
 
         # Specification object is now complete
 
@@ -191,9 +289,9 @@ class BaseSpider(scrapy.Spider):
             sockets = specs["Package Specifications"]["Sockets Supported"].split(", ")
             del specs["Package Specifications"]["Sockets Supported"]
 
-            for socket in sockets:
-                specs["socket"] = socket
-                yield CPUSpecsItem(specs)
+            # Pipeline writes one file per socket
+            specs["sockets"] = sockets
+            yield CPUSpecsItem(specs)
 
 
 class CpuSpecListSpider(BaseSpider):
@@ -202,11 +300,23 @@ class CpuSpecListSpider(BaseSpider):
     """
     name = 'cpuspecs'
 
+    _XP_PANELS = etree.XPath("//div[@data-parent-panel-key='Processors']/div/div/@data-panel-key")
+    # $key is bound per panel, so the expression is compiled only once
+    _XP_PANELLINKS = etree.XPath("//div[@data-parent-panel-key=$key]/div/div/span/a/@href")
+
     def parse(self, response: scrapy.http.Response):
-        for panelId in response.xpath("//div[@data-parent-panel-key='Processors']/div/div/@data-panel-key"):
+        root = response.selector.root
+        # Series can be listed under several panels, skip it before the scheduler
+        seen = set()
+
+        for panelId in self._XP_PANELS(root):
             # Series such as Core, Atom, Xeon, etc, ....
-            for link in response.xpath(f"//div[@data-parent-panel-key='{panelId.root}']/div/div/span/a/@href"):
-                yield scrapy.Request(response.urljoin(link.root), callback=self.parse_series)
+            for link in self._XP_PANELLINKS(root, key=panelId):
+                url = response.urljoin(link)
+                if url in seen:
+                    continue
+                seen.add(url)
+                yield scrapy.Request(url, callback=self.parse_series)
 
 
 class CpuSpecSpider(BaseSpider):
@@ -228,7 +338,7 @@ class CpuSpecSpider(BaseSpider):
         self.start_urls = [url]
 
     def parse(self, response: scrapy.http.Response):
-        yield scrapy.Request(response.url, callback=self.parse_specs)
+        yield from self.parse_specs(response)
 
 
 class SeriesSpider(BaseSpider):
@@ -254,4 +364,4 @@ class SeriesSpider(BaseSpider):
         self.start_urls = [url]
 
     def parse(self, response: scrapy.http.Response):
-        yield scrapy.Request(response.url, callback=self.parse_series)
+        yield from self.parse_series(response)